@@ -0,0 +1,33 @@
+"""
+Shared DTO Helpers
+
+Pydantic config and field types shared by the API request/response models
+in backend/main.py and the root main.py (imported there as backend.dto).
+"""
+
+from typing import Annotated
+from pydantic import BaseModel, BeforeValidator, ConfigDict
+
+# Request/response DTOs are never mutated after construction
+DTO_CONFIG = ConfigDict(frozen=True, extra="ignore", defer_build=True)
+
+
+def _check_http_url(v):
+    # Only the scheme matters here; HttpUrl's full parse is not needed
+    if not isinstance(v, str) or not v[:8].lower().startswith(("http://", "https://")):
+        raise ValueError("must be an http(s) URL")
+    return v
+
+
+# str field that only accepts http(s) URLs (scheme is case-insensitive)
+HttpUrlStr = Annotated[str, BeforeValidator(_check_http_url)]
+
+
+def build_models(*models: type[BaseModel]) -> None:
+    """
+    Build deferred (defer_build) model validators ahead of the first request.
+    Models that are already built, e.g. by constructing an instance at import,
+    are left as is.
+    """
+    for model in models:
+        model.model_rebuild()
@@ -1,27 +1,56 @@
 import os
-from typing import List, Optional
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, HttpUrl
-
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from fastapi import FastAPI, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, field_validator
+
+# Shared helpers live next to this file, so it runs standalone (python backend/main.py,
+# cd backend && uvicorn main:app) and as backend.main from the repo root
+try:
+    from .cors import AllowAllCORSMiddleware
+    from .dto import DTO_CONFIG, HttpUrlStr, build_models
+except ImportError:
+    from cors import AllowAllCORSMiddleware  # type: ignore
+    from dto import DTO_CONFIG, HttpUrlStr, build_models  # type: ignore
+
+# Resolve the optional database module once instead of importing it per /test call
+try:
+    from database import db, list_collection_names_cached  # type: ignore
+    _db_import_error = None
+except ImportError:
+    db = None
+    _db_import_error = "❌ Database module not found (run enable-database first)"
+except Exception as e:
+    db = None
+    _db_import_error = f"❌ Error: {str(e)[:50]}"
+
+app = FastAPI(default_response_class=ORJSONResponse)
+
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
+app.add_middleware(AllowAllCORSMiddleware)
 
 
 class LiveUpdateRequest(BaseModel):
-    athlete_url: HttpUrl
-    sheet_url: HttpUrl
-    sheet_tab: str
+    model_config = DTO_CONFIG
+
+    athlete_url: HttpUrlStr
+    sheet_url: HttpUrlStr
+    sheet_tab: str = Field(..., min_length=1)
+
+    @field_validator("sheet_tab")
+    @classmethod
+    def _check_sheet_tab(cls, v):
+        if not v.strip():
+            raise ValueError("Le nom d'onglet est requis")
+        return v
 
 
 class UpdatedRow(BaseModel):
+    model_config = DTO_CONFIG
+
     row_number: int
     event: str
     date: str
@@ -31,50 +60,69 @@ class UpdatedRow(BaseModel):
 
 
 class LiveUpdateResponse(BaseModel):
+    model_config = DTO_CONFIG
+
     ok: bool
     message: str
     updated_count: int
     rows: List[UpdatedRow]
 
 
+# Demo rows are constant, so validate them once at import instead of per request
+_BASE_ROWS: Tuple[UpdatedRow, ...] = (
+    UpdatedRow(row_number=7, event="50m Freestyle", date="2024-09-14", old_time="00:27.31", new_time="00:27.12", delta="-0.19"),
+    UpdatedRow(row_number=12, event="100m Butterfly", date="2024-10-02", old_time="01:05.88", new_time="01:05.40", delta="-0.48"),
+    UpdatedRow(row_number=19, event="200m Individual Medley", date="2024-10-21", old_time="02:38.10", new_time="02:37.55", delta="-0.55"),
+)
+_MSG_TEMPLATE = "{n} ligne(s) mise(s) à jour dans l'onglet '{tab}'."
+
+
+@lru_cache(maxsize=1)
+def _env_status() -> dict:
+    """DATABASE_URL/DATABASE_NAME presence; fixed for the life of the process"""
+    return {
+        "database_url": "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set",
+        "database_name": "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set",
+    }
+
+
+@app.on_event("startup")
+def _build_models():
+    build_models(LiveUpdateRequest, UpdatedRow, LiveUpdateResponse)
+
+
 @app.get("/")
-def read_root():
+def read_root(response: Response):
+    response.headers["Cache-Control"] = "public, max-age=60"
     return {"message": "FastAPI backend running"}
 
 
 @app.get("/health")
-def health():
+def health(response: Response):
+    response.headers["Cache-Control"] = "no-store"
     return {"status": "ok"}
 
 
-@app.post("/live-update", response_model=LiveUpdateResponse)
+@app.post("/live-update", responses={200: {"model": LiveUpdateResponse}})
 async def live_update(payload: LiveUpdateRequest):
     # In a full implementation, we'd scrape Swimrankings and update Google Sheets here.
     # For this demo, we simulate the result deterministically from the tab name length
     # so the UI can display real-looking updates.
-    if not payload.sheet_tab.strip():
-        raise HTTPException(status_code=400, detail="Le nom d'onglet est requis")
-
-    base_rows = [
-        UpdatedRow(row_number=7, event="50m Freestyle", date="2024-09-14", old_time="00:27.31", new_time="00:27.12", delta="-0.19"),
-        UpdatedRow(row_number=12, event="100m Butterfly", date="2024-10-02", old_time="01:05.88", new_time="01:05.40", delta="-0.48"),
-        UpdatedRow(row_number=19, event="200m Individual Medley", date="2024-10-21", old_time="02:38.10", new_time="02:37.55", delta="-0.55"),
-    ]
-
     # Simple variation so subsequent runs can still look dynamic
     n = min(3, max(1, len(payload.sheet_tab) % 4))
-    rows = base_rows[:n]
+    rows = list(_BASE_ROWS[:n])
 
-    return LiveUpdateResponse(
+    response = LiveUpdateResponse(
         ok=True,
-        message=f"{n} ligne(s) mise(s) à jour dans l'onglet '{payload.sheet_tab}'.",
+        message=_MSG_TEMPLATE.format(n=n, tab=payload.sheet_tab),
         updated_count=len(rows),
         rows=rows,
     )
+    return ORJSONResponse(response.model_dump())
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -84,31 +132,36 @@ def test_database():
         "collections": []
     }
     try:
-        from database import db  # type: ignore
-        if db is not None:
+        if _db_import_error:
+            response["database"] = _db_import_error
+        elif db is not None:
             response["database"] = "✅ Available"
             response["database_url"] = "✅ Configured"
             response["database_name"] = getattr(db, 'name', "✅ Connected")
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await list_collection_names_cached()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
                 response["database"] = f"⚠️  Connected but Error: {str(e)[:50]}"
         else:
             response["database"] = "⚠️  Available but not initialized"
-    except ImportError:
-        response["database"] = "❌ Database module not found (run enable-database first)"
     except Exception as e:
         response["database"] = f"❌ Error: {str(e)[:50]}"
 
-    response["database_url"] = "✅ Set" if os.getenv("DATABASE_URL") else "❌ Not Set"
-    response["database_name"] = "✅ Set" if os.getenv("DATABASE_NAME") else "❌ Not Set"
+    response.update(_env_status())
     return response
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+    )
@@ -0,0 +1,79 @@
+"""
+Bulk Swim Time Helpers
+
+Vectorized draws and m:ss.mmm formatting for large batches of swim times
+(bulk scraping mode). main.py only imports this module once a batch is big
+enough to need it: numpy + numba add ~100 MB RSS and ~0.7 s of import time,
+which the 1-3 row live-update path should not pay in every worker.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+from numba import int64, njit, uint8, void
+
+_NP_RNG = np.random.default_rng()
+
+FMT_WIDTH = 12  # "m:ss.mmm" with up to 5 minute digits
+MAX_MS = 100000 * 60 * 1000  # first duration that no longer fits in FMT_WIDTH bytes
+
+
+@njit(void(int64[:], uint8[:, :]), cache=True, boundscheck=False)
+def _fmt_ms_kernel(ms_arr, out):
+    """Write each duration in ms_arr as ASCII m:ss.mmm into a row of out, NUL-padded.
+    No bounds checks: callers must pass durations in [0, MAX_MS) (see fmt_ms_batch).
+    """
+    for i in range(ms_arr.shape[0]):
+        sec, ms_part = divmod(ms_arr[i], 1000)
+        m, s = divmod(sec, 60)
+
+        # Minutes, no leading zeros
+        n = 1
+        t = m // 10
+        while t > 0:
+            n += 1
+            t //= 10
+        t = m
+        for k in range(n - 1, -1, -1):
+            d = t // 10
+            out[i, k] = 48 + (t - d * 10)
+            t = d
+
+        out[i, n] = 58  # ':'
+        out[i, n + 1] = 48 + s // 10
+        out[i, n + 2] = 48 + s % 10
+        out[i, n + 3] = 46  # '.'
+        out[i, n + 4] = 48 + ms_part // 100
+        out[i, n + 5] = 48 + (ms_part // 10) % 10
+        out[i, n + 6] = 48 + ms_part % 10
+        for k in range(n + 7, out.shape[1]):
+            out[i, k] = 0
+
+
+def fmt_ms_batch(ms) -> List[str]:
+    """
+    Format a 1-D integer array of durations in milliseconds as m:ss.mmm strings.
+    Raises TypeError for non-integer input and ValueError for other shapes or
+    durations outside [0, MAX_MS), which the unchecked kernel cannot handle.
+    """
+    ms = np.asarray(ms)
+    if ms.ndim != 1:
+        raise ValueError(f"expected a 1-D array of durations, got {ms.ndim}-D")
+    if ms.size == 0:
+        # np.asarray([]) is float64, so an empty list would fail the dtype check
+        return []
+    if not np.issubdtype(ms.dtype, np.integer):
+        raise TypeError(f"expected integer milliseconds, got dtype {ms.dtype}")
+    if ms.min() < 0 or ms.max() >= MAX_MS:
+        raise ValueError(f"durations must be in [0, {MAX_MS}) ms")
+
+    out = np.empty((ms.shape[0], FMT_WIDTH), dtype=np.uint8)
+    _fmt_ms_kernel(ms.astype(np.int64, copy=False), out)
+    return [row.tobytes().rstrip(b"\0").decode("ascii") for row in out]
+
+
+def draw_times(count: int) -> Tuple[List[str], List[str], List[int]]:
+    """Draw count simulated results as (old times, new times, gains in ms)"""
+    old_ms = _NP_RNG.integers(30000, 80001, size=count)
+    gain_ms = _NP_RNG.integers(200, 1501, size=count)
+    return fmt_ms_batch(old_ms), fmt_ms_batch(old_ms - gain_ms), gain_ms.tolist()
@@ -5,11 +5,13 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 import os
+import time
 from dotenv import load_dotenv
-from typing import Union
+from typing import List, Union
 from pydantic import BaseModel
 
 # Load environment variables from .env file
@@ -17,39 +19,97 @@ load_dotenv()
 
 _client = None
 db = None
+_supports_transactions = None
+
+_COLLECTIONS_TTL = 5.0  # seconds; /test is polled as a health probe
+_collections_cache = {"t": float("-inf"), "v": []}
 
 database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    # connect=False defers socket creation to the first operation, so each
+    # forked Gunicorn worker opens its own connection pool.
+    _client = AsyncIOMotorClient(database_url, connect=False)
     db = _client[database_name]
 
-# Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
-    """Insert a single document with timestamp"""
+async def _transactions_supported() -> bool:
+    """Whether the server is a replica set member or mongos (checked once)"""
+    global _supports_transactions
+    if _supports_transactions is None:
+        hello = await _client.admin.command("hello")
+        _supports_transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
+    return _supports_transactions
+
+@asynccontextmanager
+async def transaction():
+    """Yield a session inside a transaction, or None on standalone servers"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
+    if not await _transactions_supported():
+        yield None
+        return
+
+    async with await _client.start_session() as session:
+        async with session.start_transaction():
+            yield session
+
+def _to_document(data: Union[BaseModel, dict], now: datetime) -> dict:
     # Convert Pydantic model to dict if needed
     if isinstance(data, BaseModel):
         data_dict = data.model_dump()
     else:
         data_dict = data.copy()
 
-    data_dict['created_at'] = datetime.now(timezone.utc)
-    data_dict['updated_at'] = datetime.now(timezone.utc)
+    data_dict['created_at'] = now
+    data_dict['updated_at'] = now
+    return data_dict
 
-    result = db[collection_name].insert_one(data_dict)
+# Helper functions for common database operations
+async def create_document(collection_name: str, data: Union[BaseModel, dict], session=None):
+    """Insert a single document with timestamp"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    data_dict = _to_document(data, datetime.now(timezone.utc))
+    result = await db[collection_name].insert_one(data_dict, session=session)
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
-    """Get documents from collection"""
+async def create_documents(collection_name: str, items: List[Union[BaseModel, dict]], session=None):
+    """Insert several documents with timestamps in a single round trip"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+    if not items:
+        return []
+
+    now = datetime.now(timezone.utc)
+    docs = [_to_document(item, now) for item in items]
+    # ordered=False keeps inserting the remaining documents if one fails
+    result = await db[collection_name].insert_many(docs, ordered=False, session=session)
+    return [str(_id) for _id in result.inserted_ids]
+
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None, sort: list = None):
+    """Get documents from collection, optionally sorted server-side by [(field, direction)]"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
     
     cursor = db[collection_name].find(filter_dict or {})
+    if sort:
+        cursor = cursor.sort(sort)
     if limit:
         cursor = cursor.limit(limit)
     
-    return list(cursor)
+    # The cursor is already limited; to_list(0) would mean "no documents" in motor
+    return await cursor.to_list(None)
+
+async def list_collection_names_cached() -> List[str]:
+    """Get collection names, refreshed at most every _COLLECTIONS_TTL seconds"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    now = time.monotonic()
+    if now - _collections_cache["t"] > _COLLECTIONS_TTL:
+        _collections_cache["v"] = await db.list_collection_names()
+        _collections_cache["t"] = now
+    return _collections_cache["v"]
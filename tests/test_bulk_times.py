@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from bulk_times import MAX_MS, draw_times, fmt_ms_batch
+from main import _fmt_ms
+
+
+def test_matches_scalar_formatter():
+    ms = np.random.default_rng(0).integers(0, MAX_MS, size=10_000)
+    edges = np.array([0, 999, 1000, 59_999, 60_000, 65_007, 3_599_999, MAX_MS - 1])
+    values = np.concatenate([edges, ms])
+    assert fmt_ms_batch(values) == [_fmt_ms(int(v)) for v in values]
+
+
+@pytest.mark.parametrize("empty", [[], np.array([], dtype=np.int64)])
+def test_empty_input(empty):
+    assert fmt_ms_batch(empty) == []
+
+
+def test_accepts_lists_and_narrow_ints():
+    assert fmt_ms_batch([65007]) == ["1:05.007"]
+    assert fmt_ms_batch(np.array([65007], dtype=np.int32)) == ["1:05.007"]
+
+
+@pytest.mark.parametrize("bad", [[-1], [-61000], [MAX_MS], np.array([2**63], dtype=np.uint64)])
+def test_rejects_out_of_range(bad):
+    with pytest.raises(ValueError):
+        fmt_ms_batch(bad)
+
+
+def test_rejects_non_1d():
+    with pytest.raises(ValueError):
+        fmt_ms_batch([[1, 2]])
+
+
+@pytest.mark.parametrize("bad", [[1.5], np.array([True])])
+def test_rejects_non_integer(bad):
+    with pytest.raises(TypeError):
+        fmt_ms_batch(bad)
+
+
+def test_draw_times():
+    old, new, gains = draw_times(100)
+    assert len(old) == len(new) == len(gains) == 100
+    assert all(200 <= g <= 1500 for g in gains)
@@ -0,0 +1,55 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.cors import AllowAllCORSMiddleware
+
+app = FastAPI()
+app.add_middleware(AllowAllCORSMiddleware)
+
+
+@app.post("/echo")
+def echo():
+    return {"ok": True}
+
+
+client = TestClient(app)
+
+
+def test_preflight_is_answered_by_the_middleware():
+    r = client.options(
+        "/echo",
+        headers={
+            "origin": "https://app.example",
+            "access-control-request-method": "POST",
+            "access-control-request-headers": "content-type",
+        },
+    )
+    assert r.status_code == 200
+    assert r.text == "OK"
+    assert r.headers["access-control-allow-origin"] == "https://app.example"
+    assert r.headers["access-control-allow-credentials"] == "true"
+    assert "POST" in r.headers["access-control-allow-methods"]
+    assert r.headers["access-control-allow-headers"] == "content-type"
+    assert r.headers["vary"] == "Origin"
+
+
+def test_request_with_origin_gets_cors_headers():
+    r = client.post("/echo", headers={"origin": "https://app.example"})
+    assert r.status_code == 200
+    assert r.json() == {"ok": True}
+    assert r.headers["access-control-allow-origin"] == "https://app.example"
+    assert r.headers["access-control-allow-credentials"] == "true"
+    assert r.headers["vary"] == "Origin"
+
+
+def test_request_without_origin_is_untouched():
+    r = client.post("/echo")
+    assert r.status_code == 200
+    assert "access-control-allow-origin" not in r.headers
+    assert "vary" not in r.headers
+
+
+def test_options_without_preflight_headers_reaches_the_app():
+    r = client.options("/echo", headers={"origin": "https://app.example"})
+    assert r.status_code == 405
+    assert r.headers["access-control-allow-origin"] == "https://app.example"